@@ -0,0 +1,243 @@
+"""
+Validate a corpus of OSCAL documents against a JADN schema
+
+Documents are validated in parallel on a pool of worker processes.  Each worker builds the codec once,
+is limited in the memory it can add for a document, and is replaced after validating a fixed number of
+documents.  A document whose worker dies is validated again on its own and reported as an error if
+that worker dies too.  All errors in each document are reported with a JSON Pointer to the invalid
+value.  The report (JSON) lists the errors and load/validate times for each document.
+"""
+import fire
+import glob
+import jadn
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from jadn.codec.codec import fset
+from typing import Any, Iterator, List, Optional
+try:
+    import resource     # Unix only: worker memory limit and peak RSS
+except ImportError:
+    resource = None
+
+SCHEMA = os.path.join('..', '..', 'Projects', 'Metaschema', 'oscal_catalog_1.1.0.jadn')
+REPORT = 'validate-corpus.json'
+
+codec: Optional[jadn.codec.Codec] = None    # Per-worker codec, built by init_worker
+root_type: str = ''
+
+
+def pointer(path: str, key: Any) -> str:
+    return f'{path}/' + str(key).replace('~', '~0').replace('/', '~1')  # RFC 6901
+
+
+def field_key(ts, key: str) -> Any:
+    if ts.Fld and isinstance(next(iter(ts.Fld)), int):     # Field IDs ('id' option)
+        return int(key) if isinstance(key, str) and key.isdigit() else key
+    return key
+
+
+def find_errors(datatype: str, val: Any, path: str = '') -> List[dict]:
+    """
+    Return all errors in val, each with a pointer to the deepest value that fails validation
+    """
+    try:
+        codec.decode(datatype, val)
+        return []
+    except (MemoryError, RecursionError):
+        raise
+    except ValueError as e:
+        msg = str(e) or f'{datatype}: invalid value {val!r:.60}'
+    except Exception as e:      # Format decoders raise TypeError, bad patterns re.error, missing tags KeyError
+        msg = f'{datatype}: {e.__class__.__name__}: {str(e) or f"invalid value {val!r:.60}"}'
+    ts = codec.symtab[datatype]
+    to = ts.TypeOpts
+    bt = ts.TypeDef.BaseType
+    tn = f'{datatype}({bt})'
+    errors = []
+
+    def node_error(error: str) -> None:
+        errors.append({'pointer': path, 'error': f'{tn}: {error}'})
+
+    if bt in ('Array', 'ArrayOf', 'Map', 'MapOf', 'Record') and isinstance(val, (list, dict)):
+        size = len([v for v in val if v is not None]) if bt == 'Array' else len(val)
+        if 'minv' in to and size < to['minv']:
+            node_error(f'length {size} < minimum {to["minv"]}')
+        if 'maxv' in to and size > to['maxv']:
+            node_error(f'length {size} > maximum {to["maxv"]}')
+    if bt in ('Map', 'Record') and isinstance(val, dict):
+        for k, v in val.items():
+            if (fs := ts.Fld.get(field_key(ts, k))) is None:
+                errors.append({'pointer': pointer(path, k), 'error': f'{tn}: unexpected field'})
+            elif fs.cTag is None and v is not None:
+                errors += find_errors(fs.Def.FieldType, v, pointer(path, k))
+        for k, fs in ts.Fld.items():
+            if val.get(str(k)) is None and fs.Opt.get('minc', 1) > 0:
+                node_error(f'missing required field "{k}"')
+    elif bt == 'Choice' and isinstance(val, dict):
+        if len(val) != 1:
+            node_error(f'choice must have one value, has {len(val)}')
+        for k, v in val.items():
+            if (fs := ts.Fld.get(field_key(ts, k))) is None:
+                errors.append({'pointer': pointer(path, k), 'error': f'{tn}: unexpected field'})
+            else:
+                errors += find_errors(fs.Def.FieldType, v, pointer(path, k))
+    elif bt == 'Array' and isinstance(val, list):
+        if len(val) > len(ts.Fld):
+            node_error(f'{len(val)} values, maximum {len(ts.Fld)}')
+        for n, v in enumerate(val):
+            if (fs := ts.Fld.get(n + 1)) is not None and v is not None and 'tagid' not in fs.Opt:
+                errors += find_errors(fs.Def.FieldType, v, pointer(path, n))
+    elif bt == 'ArrayOf' and isinstance(val, list):
+        if ('set' in to or 'unique' in to) and len(fset(val)) != len(val):
+            node_error('duplicate values')
+        for n, v in enumerate(val):
+            errors += find_errors(to['vtype'], v, pointer(path, n))
+    elif bt == 'MapOf' and isinstance(val, dict):
+        for k, v in val.items():
+            errors += find_errors(to['vtype'], v, pointer(path, k))
+    return errors if errors else [{'pointer': path, 'error': msg}]
+
+
+def address_space() -> int:
+    try:    # Linux: virtual size of this process
+        with open('/proc/self/statm') as fp:
+            return int(fp.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def init_worker(schema: dict, datatype: str, max_mb: int) -> None:
+    global codec, root_type
+    codec = jadn.codec.Codec(schema, verbose_rec=True, verbose_str=True)
+    root_type = datatype
+    if resource and max_mb:     # Limit address space (not RSS) above what the worker already uses
+        limit = address_space() + max_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def validate_document(fn: str) -> dict:
+    result = {'document': fn, 'type': root_type, 'valid': False, 'errors': []}
+    t0 = t1 = time.perf_counter()
+    try:
+        with open(fn, encoding='utf-8') as fd:
+            doc = json.load(fd)
+        t1 = time.perf_counter()
+        result['errors'] = find_errors(root_type, doc)
+        result['valid'] = not result['errors']
+    except MemoryError:
+        result['errors'] = [{'pointer': '', 'error': 'worker exceeded memory limit'}]
+    except Exception as e:      # Any failure is an error in this document, not in the corpus run
+        result['errors'] = [{'pointer': '', 'error': f'{e.__class__.__name__}: {e}'}]
+    t2 = time.perf_counter()
+    result.update({'load_time': round(t1 - t0, 4), 'validate_time': round(t2 - t1, 4)})
+    if resource:
+        result['worker_lifetime_peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result
+
+
+def file_size(fn: str) -> int:
+    try:
+        return os.path.getsize(fn)
+    except OSError:     # Missing file is reported by validate_document
+        return 0
+
+
+def run_workers(files: List[str], init_args: tuple, workers: int, recycle: int) -> Iterator[dict]:
+    """
+    Yield the result for each file.  At most one document per worker is in progress, so when a worker
+    dies (memory limit, killed) only those documents are lost.  Each is then run again in a pool of its
+    own, and reported as an error if that worker also dies.  The pool is replaced after workers * recycle
+    documents.
+    """
+    queue = deque(files)
+    suspect = set()
+    while queue:
+        alone = queue[0] in suspect
+        n = 1 if alone else workers
+        quota = 1 if alone else n * recycle if recycle else len(queue)     # Documents before replacing pool
+        with ProcessPoolExecutor(n, initializer=init_worker, initargs=init_args) as pool:
+            running = {}
+            started = 0
+            while queue or running:
+                while queue and len(running) < n and started < quota:
+                    fn = queue.popleft()
+                    running[pool.submit(validate_document, fn)] = fn
+                    started += 1
+                if not running:
+                    break       # Replace the pool
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                try:
+                    for f in done:
+                        r = f.result()
+                        del running[f]
+                        yield r
+                except BrokenProcessPool:
+                    if alone:
+                        fn = running.popitem()[1]
+                        error = 'worker exceeded memory limit' if init_args[2] else 'worker exited'
+                        yield {'document': fn, 'type': init_args[1], 'valid': False,
+                               'errors': [{'pointer': '', 'error': error}], 'load_time': 0, 'validate_time': 0}
+                    else:
+                        suspect.update(running.values())
+                        queue.extendleft(running.values())
+                    break
+
+
+def validate_corpus(corpus: str = '.', schema: str = SCHEMA, datatype: str = '', report: str = REPORT,
+                    workers: int = 0, max_mb: int = 2048, recycle: int = 20) -> None:
+    """
+    Validate each .json document in a directory (or matching a glob pattern) and write a report
+
+    corpus   - directory or glob pattern of documents to validate
+    datatype - type of each document, default is the first type exported by the schema
+    workers  - number of worker processes, default is the number of CPUs
+    max_mb   - address space (not RSS) in MiB a worker may add while validating, 0 for no limit
+    recycle  - number of documents validated by a worker before it is replaced
+    """
+    try:    # Check the schema once here: a worker initializer that fails is restarted by Pool forever
+        with open(schema, encoding='utf-8') as fp:
+            sc = jadn.load_any(fp)
+        datatype = datatype if datatype else sc['info']['exports'][0]
+        if datatype not in jadn.codec.Codec(sc, verbose_rec=True, verbose_str=True).symtab:
+            raise ValueError(f'datatype "{datatype}" is not defined')
+    except Exception as e:
+        msg = str(e).splitlines()[0] if str(e) else ''
+        raise SystemExit(f'{schema}: cannot validate with this schema: {e.__class__.__name__}: {msg}')
+
+    if os.path.isdir(corpus):
+        files = [f.path for f in os.scandir(corpus) if os.path.splitext(f.name)[1] == '.json']
+    else:
+        files = glob.glob(corpus, recursive=True)
+    files = [f for f in files if os.path.abspath(f) != os.path.abspath(report)]     # Skip previous report
+    files.sort(key=file_size, reverse=True)     # Start large documents first
+    print(f'{schema}: {len(files)} documents')
+    t0 = time.perf_counter()
+    results = []
+    for r in run_workers(files, (sc, datatype, max_mb), workers or os.cpu_count() or 1, recycle):
+        results.append(r)
+        print(f'{r["document"]}: {len(r["errors"])} errors, {r["validate_time"]:.3f}s')
+        for e in r['errors']:
+            print(f'  ### {e["pointer"] or "/"}: {e["error"]}')
+    results.sort(key=lambda r: r['document'])
+    summary = {
+        'schema': schema,
+        'type': datatype,
+        'documents': len(results),
+        'valid': sum(r['valid'] for r in results),
+        'errors': sum(len(r['errors']) for r in results),
+        'elapsed_time': round(time.perf_counter() - t0, 4),
+    }
+    with open(report, 'w', encoding='utf-8') as fp:
+        json.dump({'summary': summary, 'results': results}, fp, indent=2)
+    print('\n'.join([f'{k:>15}: {v}' for k, v in summary.items()]))
+
+
+if __name__ == '__main__':
+    try:
+        fire.Fire(validate_corpus)
+    except FileNotFoundError as e:
+        print(e)
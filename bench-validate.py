@@ -0,0 +1,105 @@
+"""
+Compare bulk (column by column) and per-element validation of a large homogeneous ArrayOf(Record)
+"""
+import fire
+import jadn
+import random
+import time
+from jadn.codec.codec import fset
+from validate import bulk_errors
+
+SCHEMA = {
+    'info': {
+        'package': 'http://example.com/bench/v1',
+        'exports': ['Files'],
+        'config': {'$MaxElements': 10000000}
+    },
+    'types': [
+        ['Files', 'ArrayOf', ['*File', '{1', 'q'], '', []],
+        ['File', 'Record', [], '', [
+            [1, 'name', 'Name', [], ''],
+            [2, 'algorithm', 'Algorithm', [], ''],
+            [3, 'digest', 'Digest', [], ''],
+            [4, 'size', 'Size', [], ''],
+            [5, 'executable', 'Boolean', ['[0'], ''],
+            [6, 'attributes', 'Attributes', ['[0'], ''],
+            [7, 'version', 'Number', ['[0'], '']
+        ]],
+        ['Name', 'String', ['{1', '}255'], '', []],
+        ['Algorithm', 'Enumerated', [], '', [
+            [1, 'md5', ''], [2, 'sha1', ''], [3, 'sha256', ''], [4, 'other', '']
+        ]],
+        ['Digest', 'String', ['%^[0-9a-f]{32,64}$'], '', []],
+        ['Size', 'Integer', ['{0'], '', []],
+        ['Attributes', 'Map', ['{1'], '', [
+            [1, 'owner', 'String', ['[0'], ''],
+            [2, 'mode', 'Integer', ['[0'], '']
+        ]]
+    ]
+}
+
+EDITS = (   # Changes made to bad rows: one for each batched check, and valid values the codec accepts
+    lambda f: f.update(algorithm='crc32'),      # Enumerated value
+    lambda f: f.update(size='12'),              # Type
+    lambda f: f.update(size=True),              # Boolean is not Integer
+    lambda f: f.update(name=''),                # Length
+    lambda f: f.update(digest='XYZ'),           # Pattern
+    lambda f: f.update(size=-1),                # Range
+    lambda f: f.pop('digest'),                  # Missing field
+    lambda f: f.update(checksum='00'),          # Unexpected field
+    lambda f: f.update(attributes={}),          # Empty Map
+    lambda f: f.clear(),                        # Empty Record
+    lambda f: f.update(executable=None),        # Valid: null is absent
+    lambda f: f.update(attributes={'mode': 7}),     # Valid
+)
+
+
+def make_files(count: int, bad: float) -> list:
+    rnd = random.Random(count)
+    files = [{
+        'name': f'usr/lib/file-{n}.so',
+        'algorithm': rnd.choice(('md5', 'sha1', 'sha256')),
+        'digest': f'{rnd.getrandbits(256):064x}',
+        'size': rnd.randrange(1 << 20),
+        'executable': n % 2 == 0
+    } for n in range(count)]
+    for k, n in enumerate(rnd.sample(range(count), int(count * bad))):
+        EDITS[k % len(EDITS)](files[n])
+    if bad:     # Valid elements, but duplicates in a unique array: the codec compares 1 == 1.0
+        files[0]['version'] = 1
+        files[1] = dict(files[0], version=1.0)
+    return files
+
+
+def per_element(codec: jadn.codec.Codec, data: list) -> list:
+    errors = []
+    op = codec.symtab['Files'].TypeOpts     # ArrayOf checks made by the codec before decoding elements
+    if not op.get('minv', 0) <= len(data) <= op.get('maxv', len(data)) or len(fset(data)) != len(data):
+        errors.append(('', 'Files: bad array'))
+    for n, v in enumerate(data):
+        try:
+            codec.decode('File', v)
+        except (ValueError, TypeError) as e:
+            errors.append((f'/{n}', str(e)))
+    return errors
+
+
+def bench(sizes: tuple = (100000, 1000000), bad: float = 0.001) -> None:
+    codec = jadn.codec.Codec(jadn.check(SCHEMA), verbose_rec=True, verbose_str=True)
+    print(f'{"Items":>10} {"Per-element":>12} {"Bulk":>8} {"Speed-up":>9} {"Bad items":>10}')
+    for count in sizes:
+        data = make_files(count, bad)
+        t0 = time.perf_counter()
+        e1 = per_element(codec, data)
+        t1 = time.perf_counter()
+        e2 = bulk_errors(codec, 'Files', data)
+        t2 = time.perf_counter()
+        bad1 = {int(p.split('/')[1]) for p, e in e1 if p}
+        bad2 = {int(p.split('/')[1]) for p, e in e2 if p}     # Skip errors in the array itself
+        assert bad1 == bad2, f'Per-element only: {sorted(bad1 - bad2)[:10]}, bulk only: {sorted(bad2 - bad1)[:10]}'
+        assert any(not p for p, e in e1) == any(not p for p, e in e2), 'Errors in the array itself differ'
+        print(f'{count:>10} {t1 - t0:>11.3f}s {t2 - t1:>7.3f}s {(t1 - t0) / (t2 - t1):>8.1f}x {len(bad2):>10}')
+
+
+if __name__ == '__main__':
+    fire.Fire(bench)
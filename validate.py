@@ -1,15 +1,163 @@
 import fire
 import jadn
 import json
+import numbers
 import os
+import re
+from jadn.codec.codec import fset
+from typing import Any, Callable, List, Sequence, Tuple
 
 SCHEMA_DIR = 'Projects'
 DATA_DIR = 'Data'
 
+
+"""
+Bulk validation: check a homogeneous ArrayOf(Record) column by column instead of element by element
+"""
+def _column_errors(codec: jadn.codec.Codec, datatype: str, index: Sequence[int], col: list) -> List[Tuple[int, str]]:
+    """
+    Check all values of one field: each check is run over the whole column, and values are examined
+    one at a time only to locate the elements (index) that failed a check.
+    """
+    ts = codec.symtab[datatype]
+    td = ts.TypeDef
+    op = ts.TypeOpts
+    tn = f'{td.TypeName}({td.BaseType})'
+    bt = td.BaseType
+    if 'format' in op or bt not in ('Boolean', 'Integer', 'Number', 'String', 'Enumerated'):
+        errors = []
+        for n, v in zip(index, col):    # No batched check for this type, decode each value
+            try:
+                codec.decode(datatype, v)
+            except (ValueError, TypeError) as e:
+                errors.append((n, str(e) or f'{tn}: invalid value {v}'))
+        return errors
+
+    vtype = {'Boolean': bool, 'Integer': numbers.Integral, 'Number': numbers.Real, 'String': str}.get(bt)
+    if bt == 'Enumerated':
+        vtype = type(next(iter(ts.dMap)))
+    errors = []
+    exact = {'Integer': {int}, 'Number': {int, float}}.get(bt, {vtype})     # Avoid slow ABC isinstance checks
+    if not set(map(type, col)) <= exact:
+        nobool = bt in ('Integer', 'Number')
+        good = [type(v) in exact or (isinstance(v, vtype) and not (nobool and isinstance(v, bool))) for v in col]
+        errors = [(n, f'{tn}: {v} is not {vtype}') for n, v, g in zip(index, col, good) if not g]
+        index = [n for n, g in zip(index, good) if g]
+        col = [v for v, g in zip(col, good) if g]
+    if not col:
+        return errors
+
+    def locate(failed: List[int], msg: Callable[[Any], str]) -> None:   # failed: positions in col
+        errors.extend((index[i], msg(col[i])) for i in failed)
+
+    if bt == 'Enumerated':
+        if not set(col) <= ts.dMap.keys():
+            locate([i for i, v in enumerate(col) if v not in ts.dMap],
+                   lambda v: f'{bt}: {v} is not a valid {td.TypeName}')
+    elif bt == 'String':
+        size = list(map(len, col)) if 'minv' in op or 'maxv' in op else []
+        if 'minv' in op and min(size) < op['minv']:
+            locate([i for i, k in enumerate(size) if k < op['minv']],
+                   lambda v: f'{td.TypeName}: length {len(v)} < minimum {op["minv"]}')
+        if 'maxv' in op and max(size) > op['maxv']:
+            locate([i for i, k in enumerate(size) if k > op['maxv']],
+                   lambda v: f'{td.TypeName}: length {len(v)} > maximum {op["maxv"]}')
+        if 'pattern' in op:
+            match = re.compile(op['pattern']).match
+            if not all(found := list(map(match, col))):
+                locate([i for i, m in enumerate(found) if m is None],
+                       lambda v: f'{td.TypeName}: string "{v}" does not match {op["pattern"]}')
+    elif bt in ('Integer', 'Number'):
+        if 'minv' in op and min(col) < op['minv']:
+            locate([i for i, v in enumerate(col) if v < op['minv']],
+                   lambda v: f'{td.TypeName}: {v} < minimum {op["minv"]}')
+        if 'maxv' in op and max(col) > op['maxv']:
+            locate([i for i, v in enumerate(col) if v > op['maxv']],
+                   lambda v: f'{td.TypeName}: {v} > maximum {op["maxv"]}')
+    return errors
+
+
+def _size_errors(ts, path: str, size: int) -> List[Tuple[str, str]]:
+    op = ts.TypeOpts
+    if 'minv' in op and size < op['minv']:
+        return [(path, f'{ts.TypeDef.TypeName}: length {size} < minimum {op["minv"]}')]
+    if 'maxv' in op and size > op['maxv']:
+        return [(path, f'{ts.TypeDef.TypeName}: length {size} > maximum {op["maxv"]}')]
+    return []
+
+
+def _by_name(ts) -> bool:     # Verbose Map/Record with no tagid fields
+    return all(isinstance(k, str) and f.cTag is None for k, f in ts.Fld.items())
+
+
+def bulk_errors(codec: jadn.codec.Codec, datatype: str, data: Any, path: str = '') -> List[Tuple[str, str]]:
+    """
+    Return (path, error) for each invalid value in data.  Elements of an ArrayOf(Record) are checked
+    one field at a time, with each field error mapped back to the index of its element.
+    """
+    ts = codec.symtab[datatype]
+    td = ts.TypeDef
+    op = ts.TypeOpts
+    tn = f'{td.TypeName}({td.BaseType})'
+    if td.BaseType in ('Map', 'Record') and isinstance(data, dict) and _by_name(ts):
+        errors = _size_errors(ts, path, len(data))
+        errors += [(f'{path}/{k}', f'{tn}: unexpected field') for k in data if k not in ts.Fld]
+        for k, fs in ts.Fld.items():
+            if data.get(k) is not None:     # Null values are absent
+                errors += bulk_errors(codec, fs.Def.FieldType, data[k], f'{path}/{k}')
+            elif fs.Opt.get('minc', 1) > 0:
+                errors.append((path, f'{tn}: missing required field "{k}"'))
+        return errors
+    vs = codec.symtab.get(op.get('vtype'))
+    if not (td.BaseType == 'ArrayOf' and isinstance(data, list) and vs and vs.TypeDef.BaseType in ('Map', 'Record')
+            and vs.EncType == dict and _by_name(vs)):
+        try:
+            codec.decode(datatype, data)
+            return []
+        except (ValueError, TypeError) as e:
+            return [(path, str(e) or f'{tn}: invalid value')]
+
+    errors = _size_errors(ts, path, len(data))
+    if ('set' in op or 'unique' in op) and len(fset(data)) != len(data):     # Codec equality: 1 == 1.0 == True
+        errors.append((path, f'{tn}: duplicate values'))
+    vd = vs.TypeDef
+    vn = f'{vd.TypeName}({vd.BaseType})'
+    index = range(len(data))
+    rows = data
+    if not all(type(v) is dict for v in data):
+        errors += [(f'{path}/{n}', f'{vn}: {v} is not {dict}') for n, v in enumerate(data) if type(v) is not dict]
+        index = [n for n, v in enumerate(data) if type(v) is dict]
+        rows = [data[n] for n in index]
+    vo = vs.TypeOpts
+    if rows and ('minv' in vo or 'maxv' in vo):
+        size = list(map(len, rows))
+        if min(size) < vo.get('minv', 0) or max(size) > vo.get('maxv', max(size)):
+            minv, maxv = vo.get('minv', 0), vo.get('maxv', max(size))
+            for n, k in zip(index, size):
+                if not minv <= k <= maxv:
+                    errors += _size_errors(vs, f'{path}/{n}', k)
+    fnames = vs.Fld.keys()
+    if not set().union(*rows) <= fnames:
+        errors += [(f'{path}/{n}/{k}', f'{vn}: unexpected field')
+                   for n, v in zip(index, rows) if not v.keys() <= fnames for k in v.keys() - fnames]
+    for k, fs in vs.Fld.items():
+        col = [v.get(k) for v in rows]
+        cx = index
+        if None in col:
+            if fs.Opt.get('minc', 1) > 0:
+                errors += [(f'{path}/{index[i]}', f'{vn}: missing required field "{k}"')
+                           for i, v in enumerate(col) if v is None]
+            keep = [i for i, v in enumerate(col) if v is not None]
+            cx = [index[i] for i in keep]
+            col = [col[i] for i in keep]
+        errors += [(f'{path}/{n}/{k}', e) for n, e in _column_errors(codec, fs.Def.FieldType, cx, col)]
+    return errors
+
+
 """
 Validate a file against a JADN schema
 """
-def validate(file: str = 'checksums.json', schema: str = 'checksums.jidl') -> None:
+def validate(file: str = 'checksums.json', schema: str = 'checksums.jidl', bulk: bool = False) -> None:
     filename, ext = os.path.splitext(file)
     with open(os.path.join(SCHEMA_DIR, schema), encoding='utf-8') as fp:
         sc = jadn.load_any(fp)
@@ -18,6 +166,10 @@ def validate(file: str = 'checksums.json', schema: str = 'checksums.jidl') -> No
     with open(os.path.join(DATA_DIR, file), encoding='utf-8') as fp:
         data = json.load(fp)
     print(f'{item_type}: {len(data)}')
+    if bulk:
+        for p, e in bulk_errors(codec, item_type, data):
+            print(f' Error: {p}: {e}')
+        return
     try:
         codec.decode(item_type, data)
     except ValueError as e: